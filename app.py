@@ -4,8 +4,11 @@ A narrative-driven YouTube intelligence platform powered by Google Gemini AI
 """
 
 from flask import Flask, render_template, request, jsonify, session
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
+from typing import Any, Union
+import orjson
 import os
 import secrets
 from services.gemini_service import analyze_channel, run_battle, analyze_video_truth
@@ -13,8 +16,27 @@ from services.gemini_service import analyze_channel, run_battle, analyze_video_t
 # Load environment variables
 load_dotenv()
 
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that serializes with orjson instead of the stdlib encoder (always compact)"""
+    
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=self.option).decode()
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        # Pass orjson's bytes straight through instead of decoding to str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype='application/json')
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', secrets.token_hex(32))
 
 # Enable CORS
@@ -107,9 +129,9 @@ if __name__ == '__main__':
         print("WARNING: GEMINI_API_KEY not found in environment variables!")
         print("Please set GEMINI_API_KEY in your .env file")
     
-    # Run development server
+    # Run development server (use gunicorn in production, see gunicorn.conf.py)
     app.run(
         host='0.0.0.0',
         port=5000,
-        debug=True
+        debug=os.getenv('FLASK_DEBUG', '0') == '1'
     )
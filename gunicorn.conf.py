@@ -0,0 +1,21 @@
+"""
+TubeTale Analytics - Gunicorn Configuration
+Gevent workers keep serving requests while Gemini calls wait on the network
+
+The gevent worker runs monkey.patch_all() before importing the app, so
+requests/urllib3 (used by the Gemini REST transport) become cooperative.
+Do not enable preload_app, or the app would be imported unpatched.
+
+Usage: gunicorn app:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = 'gevent'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', '500'))
+
+# Grounded Gemini calls can take tens of seconds
+timeout = 120
@@ -0,0 +1,112 @@
+"""
+TubeTale Analytics - Result Cache
+Redis-backed cache shared across workers, fronted by a small in-process LRU
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import orjson
+import redis
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+REDIS_URL = os.getenv('REDIS_URL')
+DEFAULT_TTL = 3600  # 1 hour
+LOCAL_CACHE_SIZE = 128
+LOCAL_TTL = 300  # Redis hits are kept locally for 5 minutes
+
+REDIS_TIMEOUT = 0.2  # seconds; an unreachable Redis is treated as a cache miss
+
+# Shared Redis client (None when REDIS_URL is not configured)
+redis_client: Optional[redis.Redis] = redis.Redis.from_url(
+    REDIS_URL,
+    socket_connect_timeout=REDIS_TIMEOUT,
+    socket_timeout=REDIS_TIMEOUT
+) if REDIS_URL else None
+
+# Local LRU tier: key -> (expires_at, value)
+_local: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _local_get(key: str) -> Optional[Any]:
+    """Read a key from the in-process tier, dropping it if expired"""
+    with _local_lock:
+        entry = _local.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _local[key]
+            return None
+
+        _local.move_to_end(key)
+        return value
+
+
+def _local_set(key: str, value: Any, ttl: int) -> None:
+    """Store a key in the in-process tier, evicting the least recently used"""
+    with _local_lock:
+        _local[key] = (time.monotonic() + ttl, value)
+        _local.move_to_end(key)
+        while len(_local) > LOCAL_CACHE_SIZE:
+            _local.popitem(last=False)
+
+
+def cache_get(key: str) -> Optional[Any]:
+    """
+    Look up a cached value
+
+    Args:
+        key: Cache key
+
+    Returns:
+        The cached value, or None on a miss
+    """
+    value = _local_get(key)
+    if value is not None:
+        return value
+
+    if redis_client is None:
+        return None
+
+    try:
+        raw = redis_client.get(key)
+    except redis.RedisError as e:
+        print(f"Cache read failed for {key}: {e}")
+        return None
+
+    if raw is None:
+        return None
+
+    value = orjson.loads(raw)
+    _local_set(key, value, LOCAL_TTL)
+    return value
+
+
+def cache_set(key: str, value: Any, ttl: int = DEFAULT_TTL) -> None:
+    """
+    Store a value in both cache tiers
+
+    Args:
+        key: Cache key
+        value: JSON-serializable value
+        ttl: Time to live in seconds
+    """
+    _local_set(key, value, ttl)
+
+    if redis_client is None:
+        return
+
+    try:
+        redis_client.setex(key, ttl, orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY))
+    except (redis.RedisError, TypeError) as e:
+        print(f"Cache write failed for {key}: {e}")
@@ -1,67 +1,101 @@
 """
 TubeTale Analytics - Data Processing Utility
-Uses pandas and numpy for enhanced data analysis and statistical calculations
+Uses numpy for enhanced data analysis and statistical calculations
 """
 
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Any, Optional
+from math import isfinite, sqrt
+from statistics import NormalDist
+from typing import Dict, List, Any, Optional, Tuple
 
+# Fields every channel analysis must contain
+REQUIRED_CHANNEL_FIELDS = frozenset({'channelName', 'stats', 'growthTimeline'})
 
-def create_growth_dataframe(growth_timeline: List[Dict]) -> pd.DataFrame:
+# Two-sided z-scores for common confidence levels
+_Z_SCORES = {0.90: 1.6448536269514722, 0.95: 1.959963984540054, 0.99: 2.5758293035489004}
+
+
+def _trend_stats(y: np.ndarray) -> Tuple[float, float, float]:
+    """Least-squares slope, intercept and R-squared of y against its index"""
+    n = y.size
+    x = np.arange(n, dtype=np.float64)
+    x_mean = (n - 1) / 2
+    y_mean = y.mean()
+    
+    # Closed-form fit (avoids polyfit's LAPACK dispatch on tiny inputs)
+    dx = x - x_mean
+    dy = y - y_mean
+    slope = float(dx @ dy / (dx @ dx))
+    intercept = float(y_mean - slope * x_mean)
+    
+    # Residuals around the fit are dy - slope * dx
+    residuals = dy - slope * dx
+    ss_tot = float(dy @ dy)
+    ss_res = float(residuals @ residuals)
+    
+    # A flat series is fit perfectly by a flat line
+    if ss_tot == 0.0:
+        return slope, intercept, 1.0
+    
+    return slope, intercept, 1.0 - ss_res / ss_tot
+
+
+def growth_arrays(growth_timeline: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    Convert growth timeline to pandas DataFrame for analysis
+    Convert growth timeline to parallel arrays for analysis
     
     Args:
         growth_timeline: List of dicts with year, subscribers, videos
         
     Returns:
-        DataFrame with validated and normalized data
+        Tuple of (years, subscribers, videos) arrays sorted by year
     """
-    if not growth_timeline:
-        return pd.DataFrame(columns=['year', 'subscribers', 'videos'])
-    
-    df = pd.DataFrame(growth_timeline)
-    
-    # Ensure correct data types
-    df['year'] = pd.to_numeric(df['year'], errors='coerce')
-    df['subscribers'] = pd.to_numeric(df['subscribers'], errors='coerce')
-    df['videos'] = pd.to_numeric(df['videos'], errors='coerce')
-    
-    # Remove any rows with missing data
-    df = df.dropna()
+    # Coerce values (the AI may return numbers as strings) and skip incomplete rows
+    rows = []
+    for entry in growth_timeline or []:
+        try:
+            row = (float(entry['year']), float(entry['subscribers']), float(entry['videos']))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if all(isfinite(value) for value in row):
+            rows.append(row)
+    
+    # float64 throughout: no overflow on oversized values, and fractions are kept
+    years = np.fromiter((row[0] for row in rows), dtype=np.float64, count=len(rows))
+    subs = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+    vids = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
     
     # Sort by year
-    df = df.sort_values('year')
+    order = years.argsort(kind='stable')
     
-    return df
+    return years[order], subs[order], vids[order]
 
 
-def calculate_growth_rate(df: pd.DataFrame) -> Dict[str, float]:
+def calculate_growth_rate(subs: np.ndarray, vids: np.ndarray) -> Dict[str, float]:
     """
     Calculate growth statistics from timeline data
     
     Args:
-        df: DataFrame with year, subscribers, videos columns
+        subs: Subscriber counts ordered by year
+        vids: Video counts ordered by year
         
     Returns:
         Dict with growth metrics
     """
-    if len(df) < 2:
+    if len(subs) < 2:
         return {
             'avg_subscriber_growth': 0.0,
             'avg_video_growth': 0.0,
             'growth_trend': 'insufficient_data'
         }
     
-    # Calculate year-over-year growth rates
-    df = df.copy()
-    df['sub_growth'] = df['subscribers'].pct_change() * 100
-    df['video_growth'] = df['videos'].pct_change() * 100
+    # Calculate year-over-year growth rates and their averages (0/0 is skipped)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sub_growth = np.diff(subs) / subs[:-1] * 100
+        video_growth = np.diff(vids) / vids[:-1] * 100
     
-    # Calculate averages (excluding first NaN row)
-    avg_sub_growth = df['sub_growth'].dropna().mean()
-    avg_video_growth = df['video_growth'].dropna().mean()
+    avg_sub_growth = float(np.nanmean(sub_growth))
+    avg_video_growth = float(np.nanmean(video_growth))
     
     # Determine trend
     if avg_sub_growth > 10:
@@ -77,46 +111,33 @@ def calculate_growth_rate(df: pd.DataFrame) -> Dict[str, float]:
         'avg_subscriber_growth': round(avg_sub_growth, 2),
         'avg_video_growth': round(avg_video_growth, 2),
         'growth_trend': trend,
-        'latest_subscribers': int(df['subscribers'].iloc[-1]),
-        'latest_videos': int(df['videos'].iloc[-1])
+        'latest_subscribers': int(subs[-1]),
+        'latest_videos': int(vids[-1])
     }
 
 
-def calculate_trend_prediction(df: pd.DataFrame, periods: int = 1) -> Dict[str, Any]:
+def calculate_trend_prediction(subs: np.ndarray, periods: int = 1) -> Dict[str, Any]:
     """
     Calculate linear trend and predict future values
     
     Args:
-        df: DataFrame with year, subscribers columns
+        subs: Subscriber counts ordered by year
         periods: Number of periods to predict ahead
         
     Returns:
         Dict with trend line and predictions
     """
-    if len(df) < 3:
+    if len(subs) < 3:
         return {'prediction_available': False}
     
-    # Use numpy for linear regression
-    x = np.array(range(len(df)))
-    y = df['subscribers'].values
-    
-    # Calculate linear regression coefficients
-    coefficients = np.polyfit(x, y, 1)
-    slope, intercept = coefficients
-    
-    # Generate trend line
-    trend_line = slope * x + intercept
+    # Linear regression and R-squared
+    n = len(subs)
+    slope, intercept, r_squared = _trend_stats(subs)
     
     # Predict future values
-    future_x = np.array(range(len(df), len(df) + periods))
+    future_x = np.arange(n, n + periods)
     predictions = slope * future_x + intercept
     
-    # Calculate R-squared for trend strength
-    y_mean = np.mean(y)
-    ss_tot = np.sum((y - y_mean) ** 2)
-    ss_res = np.sum((y - trend_line) ** 2)
-    r_squared = 1 - (ss_res / ss_tot)
-    
     return {
         'prediction_available': True,
         'slope': float(slope),
@@ -126,43 +147,42 @@ def calculate_trend_prediction(df: pd.DataFrame, periods: int = 1) -> Dict[str,
     }
 
 
-def calculate_battle_statistics(scores_df: pd.DataFrame) -> Dict[str, Any]:
+def calculate_battle_statistics(scores: List[Dict]) -> Dict[str, Any]:
     """
     Calculate statistical analysis for battle comparisons
     
     Args:
-        scores_df: DataFrame with channel scores
+        scores: List of channel score dicts with an overall score
         
     Returns:
         Dict with statistical significance and rankings
     """
-    if len(scores_df) < 2:
+    if len(scores) < 2:
         return {'statistical_analysis': 'insufficient_data'}
     
-    # Calculate overall score statistics
-    overall_scores = scores_df['overall']
+    # Calculate overall score statistics (sample std dev)
+    overall_scores = np.fromiter((s['overall'] for s in scores), dtype=np.float64, count=len(scores))
+    std_dev = float(overall_scores.std(ddof=1))
+    
+    # Top two scores without a full sort
+    second_score, top_score = np.partition(overall_scores, -2)[-2:]
     
     stats = {
         'mean_score': float(overall_scores.mean()),
-        'std_dev': float(overall_scores.std()),
-        'score_range': float(overall_scores.max() - overall_scores.min()),
-        'close_competition': overall_scores.std() < 10,  # Low std dev = close battle
+        'std_dev': std_dev,
+        'score_range': float(top_score - overall_scores.min()),
+        'close_competition': std_dev < 10,  # Low std dev = close battle
     }
     
-    # Determine if winner is statistically significant
-    if len(scores_df) >= 2:
-        top_score = overall_scores.max()
-        second_score = overall_scores.nlargest(2).iloc[1]
-        score_diff = top_score - second_score
-        
-        # Winner is "decisive" if difference > 1 std dev
-        stats['decisive_winner'] = score_diff > overall_scores.std()
-        stats['score_difference'] = float(score_diff)
+    # Winner is "decisive" if difference > 1 std dev
+    score_diff = float(top_score - second_score)
+    stats['decisive_winner'] = score_diff > std_dev
+    stats['score_difference'] = score_diff
     
     return stats
 
 
-def normalize_topic_distribution(topics: List[Dict]) -> pd.DataFrame:
+def normalize_topic_distribution(topics: List[Dict]) -> List[Dict]:
     """
     Normalize topic distribution to ensure percentages sum to 100
     
@@ -170,24 +190,23 @@ def normalize_topic_distribution(topics: List[Dict]) -> pd.DataFrame:
         topics: List of dicts with name and value
         
     Returns:
-        DataFrame with normalized values
+        List of dicts with normalized percentages, sorted by value descending
     """
     if not topics:
-        return pd.DataFrame(columns=['name', 'value', 'percentage'])
-    
-    df = pd.DataFrame(topics)
+        return []
     
     # Normalize values to percentages
-    total = df['value'].sum()
-    if total > 0:
-        df['percentage'] = (df['value'] / total * 100).round(2)
-    else:
-        df['percentage'] = 0
+    total = sum(topic['value'] for topic in topics)
+    scale = 100 / total if total > 0 else 0
+    normalized = [
+        {**topic, 'percentage': round(topic['value'] * scale, 2)}
+        for topic in topics
+    ]
     
     # Sort by value descending
-    df = df.sort_values('value', ascending=False)
+    normalized.sort(key=lambda topic: topic['value'], reverse=True)
     
-    return df
+    return normalized
 
 
 def calculate_confidence_interval(score: float, sample_size: int = 100, confidence: float = 0.95) -> Dict[str, float]:
@@ -202,14 +221,17 @@ def calculate_confidence_interval(score: float, sample_size: int = 100, confiden
     Returns:
         Dict with lower and upper bounds
     """
-    # Convert score to proportion
+    # Clamp the score (the AI may return out-of-range values) and convert to proportion
+    score = min(max(score, 0.0), 100.0)
     p = score / 100.0
     
     # Calculate standard error
-    se = np.sqrt((p * (1 - p)) / sample_size)
+    se = sqrt((p * (1 - p)) / sample_size)
     
-    # Z-score for 95% confidence
-    z = 1.96 if confidence == 0.95 else 2.576 if confidence == 0.99 else 1.645
+    # Z-score for the confidence level
+    z = _Z_SCORES.get(confidence)
+    if z is None:
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
     
     # Calculate margin of error
     margin = z * se * 100  # Convert back to 0-100 scale
@@ -236,27 +258,27 @@ def validate_channel_data(channel_data: Dict) -> Dict:
         Cleaned and validated channel data
     """
     # Ensure required fields exist
-    required_fields = ['channelName', 'stats', 'growthTimeline']
-    for field in required_fields:
-        if field not in channel_data:
-            raise ValueError(f"Missing required field: {field}")
+    missing_fields = REQUIRED_CHANNEL_FIELDS - channel_data.keys()
+    if missing_fields:
+        raise ValueError(f"Missing required fields: {', '.join(sorted(missing_fields))}")
     
     # Validate growth timeline
     if 'growthTimeline' in channel_data:
-        df = create_growth_dataframe(channel_data['growthTimeline'])
+        _, subs, vids = growth_arrays(channel_data['growthTimeline'])
         
         # Add growth statistics
-        growth_stats = calculate_growth_rate(df)
+        growth_stats = calculate_growth_rate(subs, vids)
         channel_data['growthStatistics'] = growth_stats
         
         # Add trend prediction if enough data
-        trend_pred = calculate_trend_prediction(df)
+        trend_pred = calculate_trend_prediction(subs)
         if trend_pred.get('prediction_available'):
             channel_data['trendPrediction'] = trend_pred
     
     # Normalize topic distribution
     if 'topicAnalysis' in channel_data and 'topicDistribution' in channel_data['topicAnalysis']:
-        topics_df = normalize_topic_distribution(channel_data['topicAnalysis']['topicDistribution'])
-        channel_data['topicAnalysis']['topicDistribution'] = topics_df.to_dict('records')
+        channel_data['topicAnalysis']['topicDistribution'] = normalize_topic_distribution(
+            channel_data['topicAnalysis']['topicDistribution']
+        )
     
     return channel_data
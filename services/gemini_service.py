@@ -1,13 +1,22 @@
 import os
 import re
+import threading
+import orjson
 import requests
-from typing import Dict, List, Optional, Any
-import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from dotenv import load_dotenv
 from services.data_processor import (
     validate_channel_data,
     calculate_confidence_interval
 )
+from services.cache import cache_get, cache_set
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
 
 # Load environment variables
 load_dotenv()
@@ -15,21 +24,86 @@ load_dotenv()
 # Configuration
 API_KEY = os.getenv('GEMINI_API_KEY') or os.getenv('VITE_GEMINI_API_KEY')
 MODEL_NAME = "gemini-2.5-flash"
+MAX_CONCURRENT_REQUESTS = int(os.getenv('GEMINI_MAX_CONCURRENCY', '16'))
+OEMBED_CACHE_TTL = 86400  # 24 hours
+HTTP_TIMEOUT = 10  # seconds
 
-# Initialize Gemini AI
-if API_KEY:
-    genai.configure(api_key=API_KEY)
-else:
+if not API_KEY:
     raise ValueError("GEMINI_API_KEY not found in environment variables")
 
-# Simple in-memory cache
-cache: Dict[str, Any] = {}
+# Gemini SDK, imported and configured on first use to keep worker startup fast
+_genai = None
+_genai_lock = threading.Lock()
+
+# Pooled keep-alive HTTP session for YouTube requests
+_http = requests.Session()
+_http.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.1)
+))
+_http_get = partial(_http.get, timeout=HTTP_TIMEOUT)
+
+# Precompiled patterns
+_VIDEO_ID_RES = [
+    re.compile(r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/|youtube\.com\/v\/)([a-zA-Z0-9_-]{11})'),
+    re.compile(r'youtube\.com\/shorts\/([a-zA-Z0-9_-]{11})'),
+]
+
+# Caps in-flight Gemini calls per worker to stay within API quota
+_gemini_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def _get_genai():
+    """Import and configure google.generativeai (REST transport so gevent can patch its sockets)"""
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=API_KEY, transport='rest')
+                _genai = genai
+    return _genai
+
+
+def generate_content(model: 'genai.GenerativeModel', prompt: str):
+    """Call Gemini, waiting for a free slot if too many calls are in flight"""
+    with _gemini_slots:
+        return model.generate_content(prompt)
+
+
+def _find_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text, ignoring braces inside strings"""
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    
+    return None
 
 
 def extract_json(text: str) -> Dict:
     """Extract JSON from AI response"""
-    import json
-    
     if not text:
         raise ValueError("AI returned an empty response")
     
@@ -37,66 +111,92 @@ def extract_json(text: str) -> Dict:
     
     # Try direct JSON parse
     try:
-        return json.loads(clean_text)
-    except json.JSONDecodeError:
+        return orjson.loads(clean_text)
+    except orjson.JSONDecodeError:
         pass
     
-    # Try to extract from code blocks
-    patterns = [
-        r'```json\s*(\{[\s\S]*?\})\s*```',
-        r'```\s*(\{[\s\S]*?\})\s*```',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, clean_text)
-        if match:
-            try:
-                return json.loads(match.group(1))
-            except json.JSONDecodeError:
-                continue
-    
-    # Try to find first and last braces
-    first_brace = clean_text.find('{')
-    last_brace = clean_text.rfind('}')
+    # Strip a markdown code fence (```json ... ``` or ``` ... ```)
+    fence_start = clean_text.find('```')
+    if fence_start != -1:
+        body = clean_text[fence_start + 3:].removeprefix('json')
+        fence_end = body.find('```')
+        if fence_end != -1:
+            body = body[:fence_end]
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
     
-    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
+    # Scan for the outermost JSON object embedded in surrounding text
+    candidate = _find_json_object(clean_text)
+    if candidate is not None:
         try:
-            return json.loads(clean_text[first_brace:last_brace + 1])
-        except json.JSONDecodeError:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
             pass
     
     raise ValueError("Failed to parse AI response as JSON")
 
 
+def extract_sources(response: Any) -> List[Dict[str, str]]:
+    """Extract unique web sources from Gemini grounding metadata"""
+    candidates = getattr(response, 'candidates', None)
+    if not candidates:
+        return []
+    
+    grounding_metadata = getattr(candidates[0], 'grounding_metadata', None)
+    if not grounding_metadata:
+        return []
+    
+    # Keyed on URI so duplicates are dropped in the same pass
+    sources: Dict[str, Dict[str, str]] = {}
+    for chunk in getattr(grounding_metadata, 'grounding_chunks', None) or []:
+        web = getattr(chunk, 'web', None)
+        if web:
+            uri = getattr(web, 'uri', '#')
+            if uri not in sources:
+                sources[uri] = {
+                    'title': getattr(web, 'title', 'Source'),
+                    'uri': uri
+                }
+    
+    return list(sources.values())
+
+
 def extract_video_id(url: str) -> Optional[str]:
     """Extract video ID from YouTube URL"""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/|youtube\.com\/v\/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/shorts\/([a-zA-Z0-9_-]{11})'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for pattern in _VIDEO_ID_RES:
+        match = pattern.search(url)
         if match:
             return match.group(1)
     
     return None
 
 
-def fetch_video_metadata(video_url: str) -> Optional[Dict[str, str]]:
+def fetch_video_metadata(video_id: str) -> Optional[Dict[str, str]]:
     """Fetch real video metadata from YouTube oEmbed API"""
+    cache_key = f"oembed:{video_id}"
+    
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
         oembed_url = f"https://www.youtube.com/oembed?url={requests.utils.quote(video_url)}&format=json"
-        response = requests.get(oembed_url, timeout=10)
+        response = _http_get(oembed_url)
         
         if not response.ok:
             return None
         
         data = response.json()
-        return {
+        metadata = {
             'title': data.get('title', 'Unknown Title'),
             'author': data.get('author_name', 'Unknown Creator')
         }
+        cache_set(cache_key, metadata, ttl=OEMBED_CACHE_TTL)
+        
+        return metadata
     except Exception as e:
         print(f"Failed to fetch video metadata: {e}")
         return None
@@ -108,9 +208,10 @@ def analyze_channel(channel_name: str) -> Dict:
     """Analyze a YouTube channel using Gemini AI with Google Search grounding"""
     cache_key = f"channel:{channel_name.lower()}"
     
-    if cache_key in cache:
+    cached = cache_get(cache_key)
+    if cached is not None:
         print(f'Returning cached result for {channel_name}')
-        return cache[cache_key]
+        return cached
     
     channel_schema = """{
   "channelName": "string",
@@ -134,40 +235,19 @@ Return ONLY a valid JSON object matching this schema:
 """
     
     try:
-        model = genai.GenerativeModel(
+        model = _get_genai().GenerativeModel(
             model_name=MODEL_NAME,
             tools='google_search_retrieval'
         )
         
-        response = model.generate_content(prompt)
+        response = generate_content(model, prompt)
         channel_data = extract_json(response.text)
         
-        # Validate and enhance with pandas/numpy
+        # Validate and enhance with numpy
         channel_data = validate_channel_data(channel_data)
         
-        # Extract sources from grounding metadata
-        sources = []
-        if hasattr(response, 'candidates') and response.candidates:
-            candidate = response.candidates[0]
-            if hasattr(candidate, 'grounding_metadata') and candidate.grounding_metadata:
-                if hasattr(candidate.grounding_metadata, 'grounding_chunks'):
-                    for chunk in candidate.grounding_metadata.grounding_chunks:
-                        if hasattr(chunk, 'web') and chunk.web:
-                            sources.append({
-                                'title': getattr(chunk.web, 'title', 'Source'),
-                                'uri': getattr(chunk.web, 'uri', '#')
-                            })
-        
-        # Remove duplicate sources
-        unique_sources = []
-        seen_uris = set()
-        for source in sources:
-            if source['uri'] not in seen_uris:
-                unique_sources.append(source)
-                seen_uris.add(source['uri'])
-        
-        channel_data['sources'] = unique_sources
-        cache[cache_key] = channel_data
+        channel_data['sources'] = extract_sources(response)
+        cache_set(cache_key, channel_data)
         
         return channel_data
     
@@ -180,11 +260,22 @@ Return ONLY a valid JSON object matching this schema:
 
 def run_battle(channel_names: List[str]) -> Dict:
     """Run a battle comparison between multiple channels"""
-    import pandas as pd
     from services.data_processor import calculate_battle_statistics
     
-    # Analyze all channels
-    channels = [analyze_channel(name) for name in channel_names]
+    # Order-independent key so ["A", "B"] and ["B", "A"] share an entry
+    cache_key = f"battle:{'|'.join(sorted(name.lower() for name in channel_names))}"
+    
+    cached = cache_get(cache_key)
+    if cached is not None:
+        print(f'Returning cached battle for {", ".join(channel_names)}')
+        return cached
+    
+    # Analyze all channels concurrently (each call is a blocking Gemini request).
+    # Threads rather than asyncio: the async Gemini client requires the gRPC
+    # transport, which gevent workers cannot patch. Latency is already the
+    # slowest channel rather than the sum.
+    with ThreadPoolExecutor(max_workers=len(channel_names)) as executor:
+        channels = list(executor.map(analyze_channel, channel_names))
     
     synthesis_prompt = f"""
 You are a YouTube battle analyst. Compare these channels: {', '.join([c['channelName'] for c in channels])}.
@@ -196,22 +287,22 @@ Return ONLY valid JSON:
 }}"""
     
     try:
-        model = genai.GenerativeModel(model_name=MODEL_NAME)
-        response = model.generate_content(synthesis_prompt)
+        model = _get_genai().GenerativeModel(model_name=MODEL_NAME)
+        response = generate_content(model, synthesis_prompt)
         synthesis = extract_json(response.text)
         
-        # Create DataFrame for statistical analysis
-        scores_df = pd.DataFrame(synthesis['scores'])
-        
         # Calculate statistical insights
-        battle_stats = calculate_battle_statistics(scores_df)
+        battle_stats = calculate_battle_statistics(synthesis['scores'])
         
-        return {
+        result = {
             'channels': channels,
             'scores': synthesis['scores'],
             'verdict': synthesis['verdict'],
             'statistics': battle_stats  # Add statistical analysis
         }
+        cache_set(cache_key, result)
+        
+        return result
     
     except Exception as e:
         print(f"Battle Error: {e}")
@@ -222,18 +313,20 @@ Return ONLY valid JSON:
 
 def analyze_video_truth(video_input: str) -> Dict:
     """Analyze truth/fact-checking of a YouTube video"""
-    is_url = 'youtube.com/' in video_input.lower() or 'youtu.be/' in video_input.lower()
-    
-    if not is_url:
-        raise ValueError('Please provide a valid YouTube URL (youtube.com or youtu.be link)')
-    
     video_id = extract_video_id(video_input)
     if not video_id:
-        raise ValueError('Could not extract video ID from URL. Please provide a valid YouTube link.')
+        raise ValueError('Please provide a valid YouTube URL (youtube.com or youtu.be link)')
+    
+    cache_key = f"truth:{video_id}"
+    
+    cached = cache_get(cache_key)
+    if cached is not None:
+        print(f'[TRUTH] Returning cached result for {video_id}')
+        return cached
     
     # Fetch real video metadata from YouTube's oEmbed API
     print('[TRUTH] Fetching real video metadata from YouTube...')
-    metadata = fetch_video_metadata(video_input)
+    metadata = fetch_video_metadata(video_id)
     
     if not metadata:
         raise ValueError('Could not fetch video information. The video may be private, deleted, or the URL is invalid.')
@@ -286,12 +379,12 @@ Return ONLY valid JSON:
 }}"""
     
     try:
-        model = genai.GenerativeModel(
+        model = _get_genai().GenerativeModel(
             model_name=MODEL_NAME,
             tools='google_search_retrieval'
         )
         
-        response = model.generate_content(prompt)
+        response = generate_content(model, prompt)
         analysis = extract_json(response.text)
         
         # Ensure the title and creator are correct (override if AI changed them)
@@ -303,28 +396,8 @@ Return ONLY valid JSON:
             confidence = calculate_confidence_interval(analysis['truthScore'])
             analysis['scoreConfidence'] = confidence
         
-        # Extract sources from grounding metadata
-        sources = []
-        if hasattr(response, 'candidates') and response.candidates:
-            candidate = response.candidates[0]
-            if hasattr(candidate, 'grounding_metadata') and candidate.grounding_metadata:
-                if hasattr(candidate.grounding_metadata, 'grounding_chunks'):
-                    for chunk in candidate.grounding_metadata.grounding_chunks:
-                        if hasattr(chunk, 'web') and chunk.web:
-                            sources.append({
-                                'title': getattr(chunk.web, 'title', 'Source'),
-                                'uri': getattr(chunk.web, 'uri', '#')
-                            })
-        
-        # Remove duplicate sources
-        unique_sources = []
-        seen_uris = set()
-        for source in sources:
-            if source['uri'] not in seen_uris:
-                unique_sources.append(source)
-                seen_uris.add(source['uri'])
-        
-        analysis['references'] = unique_sources
+        analysis['references'] = extract_sources(response)
+        cache_set(cache_key, analysis)
         
         return analysis
     